@@ -2,11 +2,13 @@
 ===============================================================================
 🎤 Bangla Speech-to-Text - GUI Application
 ===============================================================================
-Model: hishab/titu_stt_bn_fastconformer
+Models: hishab/titu_stt_bn_conformer_large, hishab/titu_stt_bn_fastconformer
 
 Features:
 - File Upload (WAV, MP3, FLAC, OGG, M4A)
 - Microphone Recording (Click Start/Stop)
+- Model Selector (recently used models stay loaded)
+- Optional low-memory mode (set LOW_MEMORY below)
 - GPU Accelerated (auto-detects CUDA)
 
 Usage:
@@ -25,12 +27,15 @@ warnings.filterwarnings('ignore')
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+from low_memory import RSS_BUDGET_MB, format_memory_report
+from model_registry import AVAILABLE_MODELS, DEFAULT_MODEL, MEMORY_BUDGET_MB, ModelRegistry
+from transcriber import SAMPLE_RATE, Transcriber
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
-#MODEL_NAME = "hishab/titu_stt_bn_fastconformer"
-MODEL_NAME = "hishab/titu_stt_bn_conformer_large"
-SAMPLE_RATE = 16000
+MODEL_NAME = DEFAULT_MODEL
+LOW_MEMORY = False  # Slim the model, decode in chunks and cap peak RAM usage
 
 # ============================================================================
 # GUI APPLICATION
@@ -38,7 +43,12 @@ SAMPLE_RATE = 16000
 
 class BanglaSTTApp:
     def __init__(self):
-        self.model = None
+        self.transcriber = Transcriber(
+            model_name=None,
+            registry=ModelRegistry(memory_budget_mb=MEMORY_BUDGET_MB, low_memory=LOW_MEMORY),
+            low_memory=LOW_MEMORY,
+            rss_budget_mb=RSS_BUDGET_MB,
+        )
         self.is_recording = False
         self.recorded_audio = None
         self.record_thread = None
@@ -75,9 +85,17 @@ class BanglaSTTApp:
         title = ttk.Label(main_frame, text="🎤 Bangla Speech-to-Text", style='Title.TLabel')
         title.grid(row=0, column=0, pady=(0, 5))
         
-        model_label = ttk.Label(main_frame, text="Model: hishab/titu_stt_bn_fastconformer", 
-                               font=('Segoe UI', 8), foreground='gray')
-        model_label.grid(row=1, column=0, pady=(0, 15))
+        model_frame = ttk.Frame(main_frame)
+        model_frame.grid(row=1, column=0, pady=(0, 15))
+        
+        ttk.Label(model_frame, text="Model:", font=('Segoe UI', 9)).grid(row=0, column=0, padx=(0, 5))
+        
+        self.model_var = tk.StringVar(value=MODEL_NAME)
+        self.model_combo = ttk.Combobox(model_frame, textvariable=self.model_var,
+                                        values=AVAILABLE_MODELS, state='readonly', width=40)
+        self.model_combo.grid(row=0, column=1)
+        self.model_combo.bind('<<ComboboxSelected>>', self.select_model)
+        self.model_combo.state(['disabled'])
         
         # ===== STATUS SECTION =====
         status_frame = ttk.LabelFrame(main_frame, text="System Status", padding="10")
@@ -175,16 +193,17 @@ class BanglaSTTApp:
         self.copy_btn.grid(row=0, column=1, sticky="e")
     
     def load_model_async(self):
-        """Load model in background thread"""
-        thread = threading.Thread(target=self._load_model, daemon=True)
-        thread.start()
+        """Load model on the transcriber's inference thread"""
+        threading.Thread(target=self._check_device, daemon=True).start()
+        
+        future = self.transcriber.set_model(MODEL_NAME)
+        future.add_done_callback(self._on_model_future)
     
-    def _load_model(self):
-        """Load the ASR model"""
+    def _check_device(self):
+        """Show the compute device"""
         try:
             import torch
             
-            # Check device
             device = "cuda" if torch.cuda.is_available() else "cpu"
             device_text = f"✅ Device: {device.upper()}"
             if device == "cuda":
@@ -193,35 +212,61 @@ class BanglaSTTApp:
                 device_text += f" | {gpu} ({vram:.1f}GB)"
             else:
                 device_text += " (GPU not available, using CPU)"
-            
-            self.root.after(0, lambda: self.device_label.configure(text=device_text))
-            
-            # Load model
-            import nemo.collections.asr as nemo_asr
-            self.model = nemo_asr.models.ASRModel.from_pretrained(MODEL_NAME)
-            self.model.eval()
-            
-            # Update UI
-            self.root.after(0, self._on_model_loaded)
-            
         except Exception as e:
-            self.root.after(0, lambda: self._on_model_error(str(e)))
+            device_text = f"❌ Device check failed: {e}"
+        
+        self.root.after(0, lambda: self.device_label.configure(text=device_text))
+    
+    def select_model(self, event=None):
+        """Switch to the model chosen in the selector"""
+        name = self.model_var.get()
+        if name == self.transcriber.model_name:
+            return
+        
+        # Resident models switch instantly, so only show progress for loads
+        if not self.transcriber.registry.is_resident(name):
+            self.model_status.configure(text=f"⏳ Loading model: {name}...", foreground='')
+            self.progress.grid()
+            self.progress.start()
+        
+        self._disable_buttons()
+        future = self.transcriber.set_model(name)
+        future.add_done_callback(self._on_model_future)
+    
+    def _on_model_future(self, future):
+        """Called on the inference thread when a model switch finishes"""
+        error = future.exception()
+        if error is None:
+            self.root.after(0, self._on_model_loaded)
+        else:
+            self.root.after(0, lambda: self._on_model_error(str(error)))
     
     def _on_model_loaded(self):
         """Called when model is loaded"""
         self.progress.stop()
         self.progress.grid_remove()
-        self.model_status.configure(text="✅ Model loaded! Ready to transcribe.")
+        resident = len(self.transcriber.registry.resident_models())
+        self.model_status.configure(
+            text=f"✅ Model loaded! Ready to transcribe. ({resident} model(s) in memory)",
+            foreground='')
         
         # Enable buttons
-        self.select_btn.state(['!disabled'])
-        self.start_btn.state(['!disabled'])
+        self._enable_buttons()
     
     def _on_model_error(self, error):
         """Called on model load error"""
         self.progress.stop()
         self.model_status.configure(text=f"❌ Error: {error}", foreground='red')
         messagebox.showerror("Error", f"Failed to load model:\n{error}")
+        
+        # Fall back to the previously loaded model, if any
+        if self.transcriber.model_name is not None:
+            self.model_var.set(self.transcriber.model_name)
+            self._on_model_loaded()
+        else:
+            # Nothing loaded: let the user pick another model
+            self.progress.grid_remove()
+            self.model_combo.state(['!disabled'])
     
     def select_file(self):
         """Open file selection dialog"""
@@ -247,41 +292,20 @@ class BanglaSTTApp:
         self._set_result("⏳ Transcribing...")
         self._disable_buttons()
         
-        def _do_transcribe():
-            try:
-                text, duration = self._transcribe(self.selected_file)
-                self.root.after(0, lambda: self._show_result(text, duration))
-            except Exception as e:
-                self.root.after(0, lambda: self._show_error(str(e)))
-            finally:
-                self.root.after(0, self._enable_buttons)
+        def _done(future):
+            self._deliver(future)
+            self.root.after(0, self._enable_buttons)
         
-        threading.Thread(target=_do_transcribe, daemon=True).start()
+        self.transcriber.submit(self.selected_file).add_done_callback(_done)
     
-    def _transcribe(self, audio_path):
-        """Transcribe audio file"""
-        import torch
-        from pydub import AudioSegment
-        
-        # Convert to 16kHz mono WAV
-        temp_wav = tempfile.mktemp(suffix=".wav")
-        audio = AudioSegment.from_file(audio_path)
-        audio = audio.set_channels(1).set_frame_rate(SAMPLE_RATE)
-        audio.export(temp_wav, format="wav")
-        
-        duration = len(audio) / 1000
-        
-        # Transcribe
-        with torch.no_grad():
-            result = self.model.transcribe([temp_wav])
-        
-        # Get text
-        text = result[0].text if hasattr(result[0], 'text') else str(result[0])
-        
-        # Cleanup
-        os.remove(temp_wav)
-        
-        return text, duration
+    def _deliver(self, future):
+        """Show a transcription future's result or error in the UI thread"""
+        try:
+            text, duration = future.result()
+            self.root.after(0, lambda: self._show_result(text, duration))
+        except Exception as e:
+            error = str(e)
+            self.root.after(0, lambda: self._show_error(error))
     
     def start_recording(self):
         """Start microphone recording"""
@@ -347,17 +371,12 @@ class BanglaSTTApp:
             sf.write(temp_path, audio_data, SAMPLE_RATE)
             
             # Transcribe
-            def _do_transcribe():
-                try:
-                    text, duration = self._transcribe(temp_path)
-                    self.root.after(0, lambda: self._show_result(text, duration))
-                except Exception as e:
-                    self.root.after(0, lambda: self._show_error(str(e)))
-                finally:
-                    os.remove(temp_path)
-                    self.root.after(0, self._reset_recording_ui)
+            def _done(future):
+                self._deliver(future)
+                os.remove(temp_path)
+                self.root.after(0, self._reset_recording_ui)
             
-            threading.Thread(target=_do_transcribe, daemon=True).start()
+            self.transcriber.submit(temp_path).add_done_callback(_done)
         else:
             self._show_error("No audio recorded!")
             self._reset_recording_ui()
@@ -380,6 +399,9 @@ class BanglaSTTApp:
         """Show transcription result"""
         self._set_result(text)
         self.duration_label.configure(text=f"⏱️ Duration: {duration:.2f}s")
+        if LOW_MEMORY:
+            report = format_memory_report(self.transcriber.memory_report(), RSS_BUDGET_MB)
+            self.duration_label.configure(text=f"⏱️ Duration: {duration:.2f}s\n{report}")
         self.rec_status.configure(text="✅ Done!", foreground='green')
     
     def _show_error(self, error):
@@ -388,21 +410,25 @@ class BanglaSTTApp:
         messagebox.showerror("Error", error)
     
     def _disable_buttons(self):
+        self.model_combo.state(['disabled'])
         self.select_btn.state(['disabled'])
         self.transcribe_btn.state(['disabled'])
         self.start_btn.state(['disabled'])
     
     def _enable_buttons(self):
+        self.model_combo.state(['!disabled'])
         self.select_btn.state(['!disabled'])
         if hasattr(self, 'selected_file'):
             self.transcribe_btn.state(['!disabled'])
         self.start_btn.state(['!disabled'])
     
     def _disable_file_buttons(self):
+        self.model_combo.state(['disabled'])
         self.select_btn.state(['disabled'])
         self.transcribe_btn.state(['disabled'])
     
     def _enable_file_buttons(self):
+        self.model_combo.state(['!disabled'])
         self.select_btn.state(['!disabled'])
         if hasattr(self, 'selected_file'):
             self.transcribe_btn.state(['!disabled'])
@@ -420,7 +446,10 @@ class BanglaSTTApp:
     
     def run(self):
         """Run the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.transcriber.close(wait=False)
 
 
 # ============================================================================
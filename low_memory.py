@@ -0,0 +1,250 @@
+"""
+===============================================================================
+🪶 Bangla Speech-to-Text - Low-Memory Mode
+===============================================================================
+Helpers for running on machines with little RAM (e.g. 8 GB laptops):
+
+- Slim models after loading: drop training-only parts, reduce weight precision
+- Release freed buffers back to the OS between requests
+- Measure peak RSS per stage (load / decode / transcribe)
+- Pick chunk length and batch audio length that keep peak RSS under a budget
+
+Usage:
+    from transcriber import Transcriber
+
+    stt = Transcriber(low_memory=True, rss_budget_mb=4096)
+    text, duration = stt.transcribe("long_audio.mp3")
+    print(format_memory_report(stt.memory_report(), 4096))
+===============================================================================
+"""
+
+import contextlib
+import gc
+import os
+import sys
+import threading
+import time
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+RSS_BUDGET_MB = 6144            # Peak process memory allowed in low-memory mode
+MIN_CHUNK_SECONDS = 10          # Shortest audio chunk sent to the model
+SILENCE_SEARCH_SECONDS = 5      # Look this far back from a chunk's end for a pause
+INITIAL_MB_PER_AUDIO_SECOND = 10  # Starting guess, refined from measurements
+BUDGET_SAFETY = 0.8             # Only plan to use this fraction of the headroom
+SAMPLE_INTERVAL_MS = 10         # RSS sampling interval while a stage runs
+
+# ============================================================================
+# MEMORY HELPERS
+# ============================================================================
+
+def current_rss_mb():
+    """Resident memory of this process (MB), or None if it can't be measured"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # Fallback for Linux without psutil
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def release_memory():
+    """Return freed memory to the OS / GPU allocator"""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+    # glibc keeps freed heap pages unless asked to trim them
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+def prepare_low_memory(model):
+    """Slim a freshly loaded model for inference
+
+    Drops training-only components and stores weights in reduced precision:
+    fp16 on GPU (run under autocast, see `inference_context`), int8 dynamic
+    quantization of linear layers on CPU.
+    """
+    import torch
+
+    # Training-only components
+    for attr in ("_train_dl", "_validation_dl", "_test_dl", "_optimizer", "_scheduler"):
+        if getattr(model, attr, None) is not None:
+            setattr(model, attr, None)
+    if getattr(model, "spec_augmentation", None) is not None:
+        model.spec_augmentation = None
+
+    model.eval()
+
+    # Reduced precision weights
+    if next(model.parameters()).is_cuda:
+        model.half()
+        if hasattr(model, "preprocessor"):
+            model.preprocessor.float()  # Feature extraction needs fp32
+        model._low_memory_autocast = True
+    else:
+        torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    release_memory()
+    return model
+
+
+def inference_context(model):
+    """Context for running a (possibly low-memory) model"""
+    if getattr(model, "_low_memory_autocast", False):
+        import torch
+        return torch.autocast("cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
+# ============================================================================
+# PEAK MEMORY MONITOR
+# ============================================================================
+
+class _StageRun:
+    """Peak RSS observed during one run of a stage"""
+
+    def __init__(self, name, rss_mb):
+        self.name = name
+        self.start_mb = rss_mb
+        self.peak_mb = rss_mb
+
+
+class PeakMemoryMonitor:
+    """Samples RSS in the background and records the peak of each stage
+
+    Spikes shorter than the sampling interval may be missed.
+    """
+
+    def __init__(self, interval_ms=SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.peaks = {}  # stage -> highest peak seen (MB)
+        self._active = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None  # Started on first use
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Measure peak RSS while the block runs"""
+        run = _StageRun(name, current_rss_mb())
+        with self._lock:
+            self._active.append(run)
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="rss-monitor",
+                                                daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+        try:
+            yield run
+        finally:
+            self._sample()
+            with self._lock:
+                self._active.remove(run)
+                if run.peak_mb is not None:
+                    self.peaks[name] = max(self.peaks.get(name, 0), run.peak_mb)
+
+    def report(self):
+        """Peak RSS per stage (MB)"""
+        with self._lock:
+            return dict(self.peaks)
+
+    def stop(self):
+        """Stop the sampling thread"""
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        with self._lock:
+            for run in self._active:
+                run.peak_mb = max(run.peak_mb or 0, rss)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if self._stopped:
+                    return
+            self._sample()
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active and not self._stopped:
+                    self._wake.clear()
+
+
+def format_memory_report(peaks, budget_mb=None):
+    """Human-readable peak RSS per stage"""
+    if not peaks:
+        return "📊 Peak memory: not available (install psutil)"
+
+    lines = ["📊 Peak memory per stage:"]
+    for name, peak in peaks.items():
+        line = f"   {name:<11} {peak:8.0f} MB"
+        if budget_mb is not None:
+            line += " ✅" if peak <= budget_mb else f" ⚠️ over {budget_mb} MB budget"
+        lines.append(line)
+    return "\n".join(lines)
+
+# ============================================================================
+# BUDGET PLANNER
+# ============================================================================
+
+class MemoryBudget:
+    """Chooses chunk length and batch audio length to keep peak RSS under a budget
+
+    The memory cost per second of audio starts from a guess and is updated
+    from measured peaks: it rises immediately and decays slowly.
+    """
+
+    def __init__(self, budget_mb=RSS_BUDGET_MB, min_chunk_seconds=MIN_CHUNK_SECONDS):
+        self.budget_mb = budget_mb
+        self.min_chunk_seconds = min_chunk_seconds
+        self.mb_per_second = INITIAL_MB_PER_AUDIO_SECOND
+
+    def plan(self):
+        """Return (chunk_seconds, batch_seconds) for the current memory headroom
+
+        batch_seconds is the total audio one model call may hold; short
+        files and chunks are grouped up to it. Chunks are as long as the
+        headroom allows, so files that fit are not split at all.
+        """
+        baseline = current_rss_mb() or 0
+        headroom = max(self.budget_mb - baseline, 0) * BUDGET_SAFETY
+        batch_seconds = headroom / self.mb_per_second
+
+        chunk_seconds = max(batch_seconds, self.min_chunk_seconds)
+        return chunk_seconds, batch_seconds
+
+    def observe(self, baseline_mb, peak_mb, audio_seconds):
+        """Update the cost estimate from a measured model call"""
+        if baseline_mb is None or peak_mb is None or audio_seconds <= 0:
+            return
+
+        cost = max(peak_mb - baseline_mb, 0) / audio_seconds
+        self.mb_per_second = max(cost, self.mb_per_second * 0.9, 0.1)
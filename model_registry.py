@@ -0,0 +1,176 @@
+"""
+===============================================================================
+🧠 Bangla Speech-to-Text - Model Registry
+===============================================================================
+Loads ASR models on demand by name and keeps the most recently used ones
+resident in memory. When the configured memory budget is exceeded, the least
+recently used models are evicted.
+
+Usage:
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry(memory_budget_mb=2048)
+    model = registry.get("hishab/titu_stt_bn_fastconformer")
+===============================================================================
+"""
+
+import threading
+from collections import OrderedDict
+
+from low_memory import prepare_low_memory, release_memory
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+AVAILABLE_MODELS = [
+    "hishab/titu_stt_bn_conformer_large",
+    "hishab/titu_stt_bn_fastconformer",
+]
+DEFAULT_MODEL = "hishab/titu_stt_bn_conformer_large"
+MEMORY_BUDGET_MB = 2048  # Total size of resident models before LRU eviction
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def model_size_mb(model):
+    """Estimate memory used by a model's weights and buffers (MB)"""
+    total = 0
+    for value in model.state_dict().values():
+        # Quantized layers store (weight, bias) tuples as packed params
+        tensors = value if isinstance(value, tuple) else (value,)
+        for tensor in tensors:
+            if hasattr(tensor, 'element_size'):
+                total += tensor.numel() * tensor.element_size()
+    return total / (1024 * 1024)
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class ModelRegistry:
+    """LRU cache of loaded ASR models, bounded by a memory budget"""
+
+    def __init__(self, memory_budget_mb=MEMORY_BUDGET_MB, low_memory=False):
+        self.memory_budget_mb = memory_budget_mb
+        self.low_memory = low_memory
+        self._models = OrderedDict()  # name -> (model, size_mb)
+        self._sizes = {}  # name -> last known size_mb, kept after eviction
+        self._lock = threading.Lock()
+        self._loading = {}  # name -> threading.Event for in-flight loads
+
+    def is_resident(self, name):
+        """True if the model is already loaded (switching is instant)"""
+        with self._lock:
+            return name in self._models
+
+    def resident_models(self):
+        """Names of loaded models, most recently used last"""
+        with self._lock:
+            return list(self._models.keys())
+
+    def resident_size_mb(self):
+        """Total estimated size of all loaded models (MB)"""
+        with self._lock:
+            return sum(size for _, size in self._models.values())
+
+    def needs_room(self, name):
+        """True if loading this model would push resident models over budget
+
+        Callers holding a reference to a resident model should drop it
+        first, or evicting that model frees nothing.
+        """
+        with self._lock:
+            if name in self._models or not self._models:
+                return False
+            total = sum(size for _, size in self._models.values())
+            return total + self._expected_size_mb(name) > self.memory_budget_mb
+
+    def get(self, name):
+        """Return the model, loading it first if it is not resident"""
+        while True:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name][0]
+
+                pending = self._loading.get(name)
+                if pending is None:
+                    # This caller performs the load
+                    pending = threading.Event()
+                    self._loading[name] = pending
+                    break
+
+            # Another thread is loading the same model; wait and re-check
+            pending.wait()
+
+        try:
+            # Make room first for the expected size
+            with self._lock:
+                evicted = self._evict(incoming_mb=self._expected_size_mb(name))
+            if evicted:
+                del evicted
+                release_memory()
+
+            model = self._load(name)
+            size = model_size_mb(model)
+            with self._lock:
+                self._models[name] = (model, size)
+                self._sizes[name] = size
+                evicted = self._evict()
+            if evicted:
+                del evicted
+                release_memory()
+            return model
+        finally:
+            with self._lock:
+                del self._loading[name]
+            pending.set()
+
+    def evict(self, name):
+        """Unload a model if it is resident"""
+        with self._lock:
+            entry = self._models.pop(name, None)
+        if entry is not None:
+            del entry
+            release_memory()
+
+    def clear(self):
+        """Unload all models"""
+        with self._lock:
+            self._models.clear()
+        release_memory()
+
+    def _load(self, name):
+        """Load a model from Hugging Face / the local cache"""
+        import nemo.collections.asr as nemo_asr
+
+        model = nemo_asr.models.ASRModel.from_pretrained(name)
+        model.eval()
+        if self.low_memory:
+            model = prepare_low_memory(model)
+        return model
+
+    def _expected_size_mb(self, name):
+        """Last known size of a model; unknown models are assumed to be as
+        large as the largest resident one (lock held)"""
+        if name in self._sizes:
+            return self._sizes[name]
+        return max((size for _, size in self._models.values()), default=0)
+
+    def _evict(self, incoming_mb=0):
+        """Drop least recently used models until within budget (lock held)
+
+        With incoming_mb, make room for a model about to be loaded. Otherwise
+        the most recently used model is always kept, even if it alone exceeds
+        the budget. Returns the evicted entries so the caller can release
+        memory after dropping the lock.
+        """
+        keep = 0 if incoming_mb else 1
+        evicted = []
+        while len(self._models) > keep:
+            total = sum(size for _, size in self._models.values()) + incoming_mb
+            if total <= self.memory_budget_mb:
+                break
+            evicted.append(self._models.popitem(last=False))
+        return evicted
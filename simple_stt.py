@@ -7,7 +7,10 @@ Use this to test if everything works before running the full GUI.
 Usage:
     python simple_stt.py                     # Interactive menu
     python simple_stt.py --file audio.wav    # Transcribe a file
+    python simple_stt.py --file a.wav b.mp3  # Transcribe several files (batched)
     python simple_stt.py --record            # Record and transcribe
+    python simple_stt.py --model hishab/titu_stt_bn_fastconformer
+    python simple_stt.py --low-memory --rss-budget 4096 --file long.mp3
 ===============================================================================
 """
 
@@ -17,12 +20,14 @@ import tempfile
 import warnings
 warnings.filterwarnings('ignore')
 
+from low_memory import RSS_BUDGET_MB, format_memory_report
+from model_registry import AVAILABLE_MODELS, DEFAULT_MODEL, MEMORY_BUDGET_MB, ModelRegistry
+from transcriber import SAMPLE_RATE, Transcriber
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
-#MODEL_NAME = "hishab/titu_stt_bn_fastconformer"
-MODEL_NAME = "hishab/titu_stt_bn_conformer_large"
-SAMPLE_RATE = 16000
+MODEL_NAME = DEFAULT_MODEL
 RECORD_SECONDS = 10  # Default recording duration
 
 # ============================================================================
@@ -82,51 +87,58 @@ def check_dependencies():
     return True
 
 
-def load_model():
-    """Load the ASR model"""
-    import nemo.collections.asr as nemo_asr
+def load_model(transcriber, model_name=MODEL_NAME):
+    """Load the ASR model (instant if already resident in the registry)"""
+    if transcriber.registry.is_resident(model_name):
+        transcriber.set_model(model_name).result()
+        print(f"\n✅ Switched to model: {model_name}")
+        return
     
-    print(f"\n⏳ Loading model: {MODEL_NAME}")
+    print(f"\n⏳ Loading model: {model_name}")
     print("   (First run downloads ~463MB, please wait...)")
     
-    model = nemo_asr.models.ASRModel.from_pretrained(MODEL_NAME)
-    model.eval()
+    transcriber.set_model(model_name).result()
     
     print("✅ Model loaded successfully!")
-    return model
 
 
-def transcribe_file(model, audio_path):
-    """Transcribe an audio file"""
-    import torch
-    from pydub import AudioSegment
+def choose_model(current):
+    """Prompt for a model name"""
+    print("\nAvailable models:")
+    for i, name in enumerate(AVAILABLE_MODELS, 1):
+        marker = " (current)" if name == current else ""
+        print(f"  {i}. {name}{marker}")
     
+    choice = input("Select model number or enter a model name: ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(AVAILABLE_MODELS):
+        return AVAILABLE_MODELS[int(choice) - 1]
+    return choice or current
+
+
+def transcribe_file(transcriber, audio_path):
+    """Transcribe an audio file"""
     print(f"\n📁 Processing: {audio_path}")
+    print("⏳ Transcribing...")
     
-    # Convert to 16kHz mono WAV
-    temp_wav = tempfile.mktemp(suffix=".wav")
-    audio = AudioSegment.from_file(audio_path)
-    audio = audio.set_channels(1).set_frame_rate(SAMPLE_RATE)
-    audio.export(temp_wav, format="wav")
-    
-    duration = len(audio) / 1000
+    text, duration = transcriber.transcribe(audio_path)
     print(f"   Duration: {duration:.2f} seconds")
     
-    # Transcribe
+    return text, duration
+
+
+def transcribe_files(transcriber, audio_paths):
+    """Transcribe several audio files in one batch"""
+    print(f"\n📁 Processing {len(audio_paths)} files")
     print("⏳ Transcribing...")
-    with torch.no_grad():
-        result = model.transcribe([temp_wav])
-    
-    # Extract text
-    if hasattr(result[0], 'text'):
-        text = result[0].text
-    else:
-        text = str(result[0])
     
-    # Cleanup
-    os.remove(temp_wav)
-    
-    return text, duration
+    return transcriber.transcribe_batch(audio_paths)
+
+
+def print_memory_report(transcriber):
+    """Print peak memory per stage (low-memory mode only)"""
+    if transcriber.low_memory:
+        print("\n" + format_memory_report(transcriber.memory_report(),
+                                         transcriber.rss_budget_mb))
 
 
 def record_audio(duration=RECORD_SECONDS):
@@ -160,18 +172,20 @@ def record_audio(duration=RECORD_SECONDS):
     return temp_path
 
 
-def interactive_mode(model):
+def interactive_mode(transcriber):
     """Interactive menu mode"""
     while True:
         print("\n" + "=" * 50)
         print("🎤 Bangla Speech-to-Text")
+        print(f"   Model: {transcriber.model_name}")
         print("=" * 50)
         print("\nOptions:")
         print("  1. Transcribe audio file")
         print("  2. Record from microphone")
-        print("  3. Exit")
+        print("  3. Switch model")
+        print("  4. Exit")
         
-        choice = input("\nSelect option (1/2/3): ").strip()
+        choice = input("\nSelect option (1/2/3/4): ").strip()
         
         if choice == "1":
             filepath = input("Enter audio file path: ").strip()
@@ -179,12 +193,13 @@ def interactive_mode(model):
             filepath = filepath.strip('"').strip("'")
             
             if os.path.exists(filepath):
-                text, duration = transcribe_file(model, filepath)
+                text, duration = transcribe_file(transcriber, filepath)
                 print("\n" + "=" * 50)
                 print("📝 RESULT")
                 print("=" * 50)
                 print(f"\n🎯 {text}")
                 print(f"\n⏱️ Duration: {duration:.2f}s")
+                print_memory_report(transcriber)
             else:
                 print(f"❌ File not found: {filepath}")
         
@@ -194,13 +209,14 @@ def interactive_mode(model):
                 dur = int(dur) if dur else RECORD_SECONDS
                 
                 audio_path = record_audio(dur)
-                text, duration = transcribe_file(model, audio_path)
+                text, duration = transcribe_file(transcriber, audio_path)
                 
                 print("\n" + "=" * 50)
                 print("📝 RESULT")
                 print("=" * 50)
                 print(f"\n🎯 {text}")
                 print(f"\n⏱️ Duration: {duration:.2f}s")
+                print_memory_report(transcriber)
                 
                 # Cleanup
                 os.remove(audio_path)
@@ -209,6 +225,13 @@ def interactive_mode(model):
                 print(f"❌ Recording failed: {e}")
         
         elif choice == "3":
+            name = choose_model(transcriber.model_name)
+            try:
+                load_model(transcriber, name)
+            except Exception as e:
+                print(f"❌ Failed to load model: {e}")
+        
+        elif choice == "4":
             print("\n👋 Goodbye!")
             break
         
@@ -223,7 +246,6 @@ def interactive_mode(model):
 def main():
     print("=" * 60)
     print("🎤 Bangla Speech-to-Text")
-    print("   Model: hishab/titu_stt_bn_fastconformer")
     print("=" * 60)
     
     # Check dependencies
@@ -233,38 +255,73 @@ def main():
     # Parse arguments
     import argparse
     parser = argparse.ArgumentParser(description="Bangla Speech-to-Text")
-    parser.add_argument("--file", type=str, help="Audio file to transcribe")
+    parser.add_argument("--file", type=str, nargs="+", help="Audio file(s) to transcribe")
     parser.add_argument("--record", action="store_true", help="Record from microphone")
     parser.add_argument("--duration", type=int, default=5, help="Recording duration (seconds)")
+    parser.add_argument("--model", type=str, default=MODEL_NAME,
+                        help=f"Model name (e.g. {', '.join(AVAILABLE_MODELS)})")
+    parser.add_argument("--memory-budget", type=int, default=MEMORY_BUDGET_MB,
+                        help="Memory budget for loaded models (MB)")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Slim the model, decode in chunks and cap peak RAM usage")
+    parser.add_argument("--rss-budget", type=int, default=RSS_BUDGET_MB,
+                        help="Peak process memory budget in low-memory mode (MB)")
     args = parser.parse_args()
     
     # Load model
-    model = load_model()
+    transcriber = Transcriber(
+        model_name=None,
+        registry=ModelRegistry(memory_budget_mb=args.memory_budget,
+                               low_memory=args.low_memory),
+        low_memory=args.low_memory,
+        rss_budget_mb=args.rss_budget,
+    )
     
-    if args.file:
-        # File mode
-        if os.path.exists(args.file):
-            text, duration = transcribe_file(model, args.file)
+    try:
+        load_model(transcriber, args.model)
+        
+        if args.file:
+            # File mode
+            missing = [path for path in args.file if not os.path.exists(path)]
+            for path in missing:
+                print(f"❌ File not found: {path}")
+            
+            paths = [path for path in args.file if path not in missing]
+            if len(paths) == 1:
+                text, duration = transcribe_file(transcriber, paths[0])
+                print("\n" + "=" * 50)
+                print("📝 RESULT")
+                print("=" * 50)
+                print(f"\n🎯 {text}")
+            elif paths:
+                results = transcribe_files(transcriber, paths)
+                print("\n" + "=" * 50)
+                print("📝 RESULTS")
+                print("=" * 50)
+                for path, (text, duration) in zip(paths, results):
+                    print(f"\n📁 {path} ({duration:.2f}s)")
+                    print(f"🎯 {text}")
+            
+            if paths:
+                print_memory_report(transcriber)
+        
+        elif args.record:
+            # Record mode
+            audio_path = record_audio(args.duration)
+            text, duration = transcribe_file(transcriber, audio_path)
             print("\n" + "=" * 50)
             print("📝 RESULT")
             print("=" * 50)
             print(f"\n🎯 {text}")
+            print_memory_report(transcriber)
+            os.remove(audio_path)
+        
         else:
-            print(f"❌ File not found: {args.file}")
-    
-    elif args.record:
-        # Record mode
-        audio_path = record_audio(args.duration)
-        text, duration = transcribe_file(model, audio_path)
-        print("\n" + "=" * 50)
-        print("📝 RESULT")
-        print("=" * 50)
-        print(f"\n🎯 {text}")
-        os.remove(audio_path)
+            # Interactive mode
+            interactive_mode(transcriber)
     
-    else:
-        # Interactive mode
-        interactive_mode(model)
+    finally:
+        transcriber.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,47 @@
+"""Shared fakes so the engine can be tested without NeMo or a real model"""
+
+import contextlib
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeTensor:
+    def __init__(self, size_mb):
+        self.size_mb = size_mb
+
+    def numel(self):
+        return int(self.size_mb * 1024 * 1024)
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    """Stands in for a NeMo ASR model; records each transcribe() call"""
+
+    def __init__(self, name, size_mb=100):
+        self.name = name
+        self.size_mb = size_mb
+        self.calls = []
+
+    def state_dict(self):
+        return {"weight": FakeTensor(self.size_mb)}
+
+    def transcribe(self, paths, batch_size=4):
+        self.calls.append(list(paths))
+        return [f"{self.name}:{os.path.basename(p)}" for p in paths]
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    """Minimal torch module: enough for the engine's inference path"""
+    torch = types.ModuleType("torch")
+    torch.no_grad = contextlib.nullcontext
+    torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    return torch
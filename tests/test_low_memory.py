@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+import low_memory
+from low_memory import MemoryBudget, PeakMemoryMonitor, format_memory_report
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    """Pretend the process uses `rss.mb` MB"""
+    state = type("RSS", (), {"mb": 1000})()
+    monkeypatch.setattr(low_memory, "current_rss_mb", lambda: state.mb)
+    return state
+
+
+def test_plan_uses_whole_headroom(rss):
+    budget = MemoryBudget(budget_mb=2000)
+    budget.mb_per_second = 8
+    # (2000 - 1000) * 0.8 / 8 = 100 seconds fit in one call: no splitting below that
+    assert budget.plan() == (pytest.approx(100), pytest.approx(100))
+
+
+def test_plan_never_chunks_below_min(rss):
+    rss.mb = 1990
+    budget = MemoryBudget(budget_mb=2000, min_chunk_seconds=10)
+    chunk_seconds, batch_seconds = budget.plan()
+    assert chunk_seconds == 10
+    assert batch_seconds < 10  # chunks then go one per model call
+
+
+def test_observe_raises_cost_immediately_and_decays_slowly(rss):
+    budget = MemoryBudget(budget_mb=2000)
+    budget.mb_per_second = 10
+
+    budget.observe(baseline_mb=1000, peak_mb=1600, audio_seconds=30)  # 20 MB/s
+    assert budget.mb_per_second == pytest.approx(20)
+    assert budget.plan()[1] == pytest.approx(40)
+
+    budget.observe(baseline_mb=1000, peak_mb=1030, audio_seconds=30)  # 1 MB/s
+    assert budget.mb_per_second == pytest.approx(18)
+
+
+def test_observe_ignores_missing_measurements(rss):
+    budget = MemoryBudget()
+    before = budget.mb_per_second
+    budget.observe(None, 1200, 10)
+    budget.observe(1000, None, 10)
+    budget.observe(1000, 1200, 0)
+    assert budget.mb_per_second == before
+
+
+def test_monitor_records_stage_peaks_and_stops(rss):
+    monitor = PeakMemoryMonitor(interval_ms=1)
+    with monitor.stage("decode"):
+        rss.mb = 1500
+    with monitor.stage("decode"):
+        rss.mb = 1200
+    assert monitor.report() == {"decode": 1500}
+
+    monitor.stop()
+    assert not any(t.name == "rss-monitor" and t.is_alive() for t in threading.enumerate())
+
+
+def test_format_memory_report_flags_over_budget():
+    text = format_memory_report({"load": 900, "transcribe": 2100}, budget_mb=2000)
+    assert "load" in text and "✅" in text
+    assert "over 2000 MB budget" in text
+
+
+def test_quietest_cut_finds_pause():
+    np = pytest.importorskip("numpy")
+    from transcriber import SAMPLE_RATE, _quietest_cut
+
+    samples = np.full(SAMPLE_RATE * 4, 1000, dtype=np.int16)
+    samples[SAMPLE_RATE * 3:SAMPLE_RATE * 3 + 320] = 0  # 20ms pause at 3s
+    cut = _quietest_cut(samples, search_samples=SAMPLE_RATE * 2)
+    assert SAMPLE_RATE * 3 <= cut < SAMPLE_RATE * 3 + 320
+
+
+def _pcm_stream(samples):
+    import io
+    return io.BytesIO(samples.astype("<i2").tobytes()).read
+
+
+def test_split_pcm_stream_keeps_short_audio_whole():
+    np = pytest.importorskip("numpy")
+    from transcriber import SAMPLE_RATE, _split_pcm_stream
+
+    samples = np.arange(SAMPLE_RATE * 7, dtype=np.int16)
+    chunks = list(_split_pcm_stream(_pcm_stream(samples), SAMPLE_RATE * 10, SAMPLE_RATE * 5))
+    assert len(chunks) == 1
+    assert np.array_equal(chunks[0], samples)
+
+
+def test_split_pcm_stream_cuts_at_pauses_without_losing_audio():
+    np = pytest.importorskip("numpy")
+    from transcriber import SAMPLE_RATE, _split_pcm_stream
+
+    # 95 seconds of "speech" with a 100ms pause every 8 seconds
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, SAMPLE_RATE * 95).astype(np.int16)
+    pauses = list(range(8 * SAMPLE_RATE, len(samples), 8 * SAMPLE_RATE))
+    for start in pauses:
+        samples[start:start + SAMPLE_RATE // 10] = 0
+
+    # Large chunks exercise the doubling buffer (starts at 60s)
+    chunks = list(_split_pcm_stream(_pcm_stream(samples), SAMPLE_RATE * 70, SAMPLE_RATE * 5))
+    assert len(chunks) == 2
+    assert np.array_equal(np.concatenate(chunks), samples)
+
+    chunks = list(_split_pcm_stream(_pcm_stream(samples), SAMPLE_RATE * 10, SAMPLE_RATE * 5))
+    assert np.array_equal(np.concatenate(chunks), samples)
+    assert all(len(c) <= SAMPLE_RATE * 10 for c in chunks)
+
+    # Every cut lands inside a pause
+    cut = 0
+    for chunk in chunks[:-1]:
+        cut += len(chunk)
+        assert any(start <= cut < start + SAMPLE_RATE // 10 for start in pauses)
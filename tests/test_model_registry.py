@@ -0,0 +1,82 @@
+import pytest
+
+from conftest import FakeModel
+from model_registry import ModelRegistry, model_size_mb
+
+
+def make_registry(budget_mb, sizes):
+    registry = ModelRegistry(memory_budget_mb=budget_mb)
+    registry.loads = []
+
+    def _load(name):
+        registry.loads.append(name)
+        return FakeModel(name, sizes[name])
+
+    registry._load = _load
+    return registry
+
+
+def test_model_size_mb():
+    assert model_size_mb(FakeModel("a", 250)) == pytest.approx(250)
+
+
+def test_resident_model_is_not_reloaded():
+    registry = make_registry(1000, {"a": 100})
+    first = registry.get("a")
+    assert registry.get("a") is first
+    assert registry.loads == ["a"]
+
+
+def test_evicts_least_recently_used():
+    registry = make_registry(1000, {"a": 500, "b": 400, "c": 300})
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # "b" is now least recently used
+    registry.get("c")
+    assert registry.resident_models() == ["a", "c"]
+    assert registry.resident_size_mb() == pytest.approx(800)
+
+
+def test_most_recent_model_kept_even_over_budget():
+    registry = make_registry(100, {"a": 50, "big": 500})
+    registry.get("a")
+    registry.get("big")
+    assert registry.resident_models() == ["big"]
+
+
+def test_known_size_evicts_before_loading():
+    registry = make_registry(1000, {"a": 600, "b": 600})
+    registry.get("a")
+    registry.get("b")  # evicts "a"; its size is remembered
+
+    resident_during_load = []
+    load = registry._load
+
+    def _load(name):
+        resident_during_load.append(registry.resident_models())
+        return load(name)
+
+    registry._load = _load
+    registry.get("a")
+    assert resident_during_load == [[]]
+    assert registry.resident_models() == ["a"]
+
+
+def test_failed_load_is_not_cached():
+    registry = ModelRegistry()
+
+    def _load(name):
+        raise OSError("no network")
+
+    registry._load = _load
+    with pytest.raises(OSError):
+        registry.get("a")
+    assert registry.resident_models() == []
+
+
+def test_needs_room():
+    registry = make_registry(1000, {"a": 600, "b": 300})
+    assert not registry.needs_room("a")  # nothing resident
+    registry.get("a")
+    assert not registry.needs_room("a")  # already resident
+    assert registry.needs_room("b")  # unknown size: assumed as large as "a"
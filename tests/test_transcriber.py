@@ -0,0 +1,223 @@
+import asyncio
+import threading
+
+import pytest
+
+import transcriber
+from conftest import FakeModel
+from model_registry import ModelRegistry
+from transcriber import Transcriber, _group_by_duration
+
+
+@pytest.fixture
+def durations(monkeypatch):
+    """Skip audio decoding: each path maps to a duration in seconds"""
+    table = {}
+    monkeypatch.setattr(transcriber, "convert_to_wav_16k",
+                        lambda path: (path, table.get(path, 1.0)))
+    return table
+
+
+def gated_registry(gate=None, error=None):
+    """Registry whose loads wait for `gate` and optionally fail"""
+    registry = ModelRegistry()
+    registry.models = {}
+
+    def _load(name):
+        if gate is not None:
+            gate.wait()
+        if error is not None:
+            raise error
+        registry.models[name] = FakeModel(name)
+        return registry.models[name]
+
+    registry._load = _load
+    return registry
+
+
+def test_sync_batch_and_async(fake_torch, durations):
+    with Transcriber("a", registry=gated_registry()) as stt:
+        assert stt.transcribe("x.wav") == ("a:x.wav", 1.0)
+        assert stt.transcribe_batch(["y.wav", "z.wav"]) == [("a:y.wav", 1.0), ("a:z.wav", 1.0)]
+        assert asyncio.run(stt.transcribe_async("w.wav")) == ("a:w.wav", 1.0)
+
+
+def test_queued_requests_are_coalesced(fake_torch, durations):
+    gate = threading.Event()
+    registry = gated_registry(gate)
+    stt = Transcriber(model_name=None, registry=registry)
+    try:
+        loaded = stt.set_model("a")
+        futures = [stt.submit(f"f{i}.wav") for i in range(10)]
+        gate.set()  # worker was busy loading; all 10 are queued now
+
+        assert loaded.result() == "a"
+        assert [f.result()[0] for f in futures] == [f"a:f{i}.wav" for i in range(10)]
+        assert [len(call) for call in registry.models["a"].calls] == [8, 2]
+    finally:
+        stt.close()
+
+
+def test_batches_are_bounded_by_audio_length(fake_torch, durations):
+    durations.update({"long1.wav": 50, "long2.wav": 50, "short.wav": 5})
+    gate = threading.Event()
+    registry = gated_registry(gate)
+    stt = Transcriber(model_name=None, registry=registry, max_batch_seconds=60)
+    try:
+        stt.set_model("a")
+        futures = [stt.submit(p) for p in ("long1.wav", "long2.wav", "short.wav")]
+        gate.set()
+        [f.result() for f in futures]
+        assert registry.models["a"].calls == [["long1.wav"], ["long2.wav", "short.wav"]]
+    finally:
+        stt.close()
+
+
+def test_group_by_duration_keeps_long_files_alone():
+    items = [("r1", "a", 100), ("r2", "b", 10), ("r3", "c", 10)]
+    assert _group_by_duration(items, 30) == [[items[0]], [items[1], items[2]]]
+
+
+def test_load_error_raised_from_constructor(fake_torch):
+    with pytest.raises(OSError, match="no network"):
+        Transcriber("a", registry=gated_registry(error=OSError("no network")))
+
+
+def test_requests_report_last_load_error(fake_torch, durations):
+    stt = Transcriber(model_name=None, registry=gated_registry(error=OSError("no network")))
+    try:
+        with pytest.raises(OSError):
+            stt.set_model("a").result()
+        with pytest.raises(RuntimeError, match="no network"):
+            stt.transcribe("x.wav")
+    finally:
+        stt.close()
+
+
+def test_submit_after_close_fails(fake_torch, durations):
+    stt = Transcriber(model_name=None, registry=gated_registry())
+    stt.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        stt.submit("x.wav")
+
+
+def test_pending_requests_fail_when_stopped(fake_torch, durations):
+    gate = threading.Event()
+    stt = Transcriber(model_name=None, registry=gated_registry(gate))
+    stt.set_model("a")  # keeps the worker busy until the gate opens
+    stt._queue.put(transcriber._STOP)  # stop arrives ahead of queued work
+    future = stt.submit("x.wav")
+    gate.set()
+    with pytest.raises(RuntimeError, match="closed"):
+        future.result(timeout=5)
+    stt.close()
+
+
+def test_close_stops_memory_monitor(fake_torch, durations):
+    with Transcriber("a", registry=gated_registry()) as stt:
+        stt.transcribe("x.wav")
+    assert not any(t.name == "rss-monitor" and t.is_alive() for t in threading.enumerate())
+
+
+def test_low_memory_joins_chunk_text(fake_torch, monkeypatch):
+    monkeypatch.setattr(transcriber, "convert_to_wav_chunks",
+                        lambda path, chunk_seconds: [(f"{path}.{i}", 10.0) for i in range(3)])
+    with Transcriber("a", registry=gated_registry(), low_memory=True) as stt:
+        assert stt.transcribe("x.wav") == ("a:x.wav.0 a:x.wav.1 a:x.wav.2", 30.0)
+        assert set(stt.memory_report()) >= {"load", "decode", "transcribe"}
+
+
+def test_switch_releases_active_model_when_both_dont_fit(fake_torch):
+    import gc
+    import weakref
+
+    registry = ModelRegistry(memory_budget_mb=1000)
+    alive = {}
+    fail = set()
+
+    def _load(name):
+        gc.collect()
+        alive[name] = {n: ref() is not None for n, ref in refs.items()}
+        if name in fail:
+            raise OSError("no network")
+        model = FakeModel(name, 600)
+        refs[name] = weakref.ref(model)
+        return model
+
+    refs = {}
+    registry._load = _load
+    with Transcriber("a", registry=registry) as stt:
+        stt.set_model("b").result()
+        assert alive["b"] == {"a": False}  # "a" was freed before "b" loaded
+        assert registry.resident_models() == ["b"]
+
+        # A failed switch falls back to the previous model (reloading it)
+        fail.add("c")
+        with pytest.raises(OSError):
+            stt.set_model("c").result()
+        assert stt.model_name == "b"
+        assert stt._model is not None
+
+
+def test_failing_model_call_only_fails_its_group(fake_torch, durations):
+    durations.update({"long1.wav": 50, "bad.wav": 50, "long3.wav": 50})
+    registry = gated_registry()
+    with Transcriber("a", registry=registry, max_batch_seconds=60) as stt:
+        model = registry.models["a"]
+        transcribe = model.transcribe
+
+        def flaky(paths, batch_size=4):
+            if "bad.wav" in paths:
+                raise RuntimeError("CUDA out of memory")
+            return transcribe(paths, batch_size)
+
+        model.transcribe = flaky
+        futures = [stt.submit(p) for p in ("long1.wav", "bad.wav", "long3.wav")]
+        assert futures[0].result() == ("a:long1.wav", 50)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            futures[1].result()
+        assert futures[2].result() == ("a:long3.wav", 50)
+
+
+def test_low_memory_failing_call_only_fails_its_requests(fake_torch, monkeypatch):
+    monkeypatch.setattr(transcriber, "convert_to_wav_chunks",
+                        lambda path, chunk_seconds: [(path, 10.0)])
+    registry = gated_registry()
+    with Transcriber("a", registry=registry, low_memory=True) as stt:
+        model = registry.models["a"]
+        transcribe = model.transcribe
+
+        def flaky(paths, batch_size=4):
+            if "bad.wav" in paths:
+                raise RuntimeError("CUDA out of memory")
+            return transcribe(paths, batch_size)
+
+        model.transcribe = flaky
+        stt.max_batch_size = 1  # one file per model call
+        futures = [stt.submit(p) for p in ("ok1.wav", "bad.wav", "ok3.wav")]
+        assert futures[0].result() == ("a:ok1.wav", 10.0)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            futures[1].result()
+        assert futures[2].result() == ("a:ok3.wav", 10.0)
+
+
+def test_low_memory_batches_short_files_together(fake_torch, monkeypatch):
+    monkeypatch.setattr(transcriber, "convert_to_wav_chunks",
+                        lambda path, chunk_seconds: [(path, 5.0)])
+    gate = threading.Event()
+    registry = gated_registry(gate)
+    stt = Transcriber(model_name=None, registry=registry, low_memory=True)
+    try:
+        stt.budget.plan = lambda: (100, 100)  # room for 100s of audio per call
+        stt.set_model("a")
+        futures = [stt.submit(f"f{i}.wav") for i in range(8)]
+        gate.set()
+        assert [f.result()[0] for f in futures] == [f"a:f{i}.wav" for i in range(8)]
+        assert [len(call) for call in registry.models["a"].calls] == [8]
+    finally:
+        stt.close()
+
+
+def test_group_by_duration_caps_item_count():
+    items = [(f"r{i}", f"p{i}", 1) for i in range(5)]
+    assert [len(g) for g in _group_by_duration(items, 100, max_items=2)] == [2, 2, 1]
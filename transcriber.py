@@ -0,0 +1,521 @@
+"""
+===============================================================================
+🎤 Bangla Speech-to-Text - Transcriber Engine
+===============================================================================
+One engine shared by the GUI and CLI. It owns the model and a dedicated
+inference thread. Requests are queued, and requests that arrive together are
+coalesced into a single batched `model.transcribe` call.
+
+In low-memory mode (see low_memory.py) audio is decoded in chunks, and chunk
+length and audio per model call are chosen to keep peak RSS under a budget.
+
+Usage:
+    from transcriber import Transcriber
+
+    with Transcriber("hishab/titu_stt_bn_fastconformer") as stt:
+        text, duration = stt.transcribe("audio.wav")               # sync
+        results = stt.transcribe_batch(["a.wav", "b.mp3"])         # batch
+        future = stt.submit("audio.wav")                           # future
+        text, duration = await stt.transcribe_async("audio.wav")   # asyncio
+        print(stt.memory_report())                                 # peak RSS
+===============================================================================
+"""
+
+import asyncio
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+from low_memory import (RSS_BUDGET_MB, SILENCE_SEARCH_SECONDS, MemoryBudget,
+                        PeakMemoryMonitor, current_rss_mb, inference_context,
+                        release_memory)
+from model_registry import DEFAULT_MODEL, ModelRegistry
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+SAMPLE_RATE = 16000
+MAX_BATCH_SIZE = 8      # Max requests coalesced into one model call
+MAX_BATCH_SECONDS = 60  # Max total audio per model call (longer files go alone)
+BATCH_WAIT_MS = 20      # How long to wait for more requests to join a batch
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def convert_to_wav_16k(audio_path):
+    """Convert any audio file to a temporary 16kHz mono WAV
+
+    Returns (temp_wav_path, duration_seconds).
+    """
+    from pydub import AudioSegment
+
+    temp_wav = tempfile.mktemp(suffix=".wav")
+    audio = AudioSegment.from_file(audio_path)
+    audio = audio.set_channels(1).set_frame_rate(SAMPLE_RATE)
+    audio.export(temp_wav, format="wav")
+
+    duration = len(audio) / 1000
+    return temp_wav, duration
+
+
+def _quietest_cut(samples, search_samples, frame_samples=SAMPLE_RATE // 50):
+    """Index of the quietest 20ms frame in the last search_samples of samples
+
+    Cutting there keeps words from being split across chunks.
+    """
+    import numpy as np
+
+    start = max(len(samples) - search_samples, 0)
+    n_frames = (len(samples) - start) // frame_samples
+    if n_frames < 2:
+        return len(samples)
+
+    region = samples[start:start + n_frames * frame_samples].astype(np.float32)
+    energy = np.abs(region).reshape(n_frames, frame_samples).mean(axis=1)
+    quietest = int(np.argmin(energy))
+    return start + quietest * frame_samples + frame_samples // 2
+
+
+def _split_pcm_stream(read, chunk_samples, search_samples):
+    """Yield int16 chunks of at most chunk_samples from a 16-bit PCM stream
+
+    `read(nbytes)` returns bytes, or b"" at the end. Samples go into a
+    buffer that grows by doubling, so decoding stays linear in the length
+    of the audio. Cuts fall at the quietest point near each chunk's end.
+    """
+    import numpy as np
+
+    read_samples = SAMPLE_RATE  # One second per read
+    buffer = np.empty(min(chunk_samples, 60 * SAMPLE_RATE) + read_samples, dtype=np.int16)
+    fill = 0
+
+    while True:
+        data = read(read_samples * 2)
+        if not data:
+            break
+        new = np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16)
+
+        if fill + len(new) > len(buffer):
+            grown = np.empty(max(len(buffer) * 2, fill + len(new)), dtype=np.int16)
+            grown[:fill] = buffer[:fill]
+            buffer = grown
+        buffer[fill:fill + len(new)] = new
+        fill += len(new)
+
+        while fill > chunk_samples:
+            cut = _quietest_cut(buffer[:chunk_samples], search_samples)
+            yield buffer[:cut].copy()
+            remainder = fill - cut
+            buffer[:remainder] = buffer[cut:fill].copy()
+            fill = remainder
+
+    if fill:
+        yield buffer[:fill].copy()
+
+
+def convert_to_wav_chunks(audio_path, chunk_seconds):
+    """Stream-decode any audio file into temporary 16kHz mono WAV chunks
+
+    Unlike `convert_to_wav_16k`, the whole file is never held in memory.
+    Files no longer than chunk_seconds stay whole; longer ones are cut at
+    the quietest point near each chunk's end.
+    Returns a list of (temp_wav_path, duration_seconds).
+    """
+    import soundfile as sf
+    from pydub import AudioSegment
+
+    cmd = [AudioSegment.converter, "-nostdin", "-v", "error", "-i", audio_path,
+           "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+    chunk_samples = int(chunk_seconds * SAMPLE_RATE)
+    search_samples = min(SILENCE_SEARCH_SECONDS * SAMPLE_RATE, chunk_samples // 2)
+
+    chunks = []
+
+    # stderr goes to a file so a chatty ffmpeg can't fill a pipe and block
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            for samples in _split_pcm_stream(proc.stdout.read, chunk_samples, search_samples):
+                temp_wav = tempfile.mktemp(suffix=".wav")
+                sf.write(temp_wav, samples, SAMPLE_RATE)
+                chunks.append((temp_wav, len(samples) / SAMPLE_RATE))
+
+            if proc.wait() != 0:
+                stderr.seek(0)
+                error = stderr.read().decode(errors='replace').strip()
+                raise RuntimeError(f"Could not decode {audio_path}: {error}")
+            if not chunks:
+                raise RuntimeError(f"No audio in {audio_path}")
+            return chunks
+
+        except Exception:
+            proc.kill()
+            proc.wait()
+            for temp_wav, _ in chunks:
+                if os.path.exists(temp_wav):
+                    os.remove(temp_wav)
+            raise
+
+
+def _group_by_duration(prepared, max_seconds, max_items=None):
+    """Split (request, temp_wav, duration) items into groups of bounded total audio
+
+    A file longer than max_seconds gets a group of its own.
+    """
+    groups = []
+    group, total = [], 0
+    for item in prepared:
+        duration = item[2]
+        full = max_items is not None and len(group) >= max_items
+        if group and (full or total + duration > max_seconds):
+            groups.append(group)
+            group, total = [], 0
+        group.append(item)
+        total += duration
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _fail(items, error):
+    """Fail the unfinished requests among (request, temp_wav, duration) items"""
+    for request, _, _ in items:
+        if not request.future.done():
+            request.future.set_exception(error)
+
+
+def _result_text(result):
+    """Extract text from a NeMo transcription result"""
+    return result.text if hasattr(result, 'text') else str(result)
+
+
+class _Request:
+    """A queued transcription request"""
+
+    def __init__(self, audio_path):
+        self.audio_path = audio_path
+        self.future = Future()
+
+
+class _SwitchModel:
+    """A queued model switch, applied in order with transcription requests"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.future = Future()
+
+
+_STOP = object()
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class Transcriber:
+    """Batched transcription engine with its own inference thread"""
+
+    def __init__(self, model_name=DEFAULT_MODEL, registry=None,
+                 max_batch_size=MAX_BATCH_SIZE, batch_wait_ms=BATCH_WAIT_MS,
+                 max_batch_seconds=MAX_BATCH_SECONDS,
+                 low_memory=False, rss_budget_mb=RSS_BUDGET_MB):
+        if registry is None:
+            registry = ModelRegistry(low_memory=low_memory)
+        self.registry = registry
+        self.model_name = None
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.max_batch_seconds = max_batch_seconds
+        self.low_memory = low_memory
+        self.rss_budget_mb = rss_budget_mb
+        self.monitor = PeakMemoryMonitor()
+        self.budget = MemoryBudget(rss_budget_mb)
+
+        self._model = None
+        self._switch_error = None
+        self._queue = queue.Queue()
+        self._closed = False
+        self._put_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="transcriber", daemon=True)
+        self._thread.start()
+
+        if model_name:
+            try:
+                self.set_model(model_name).result()
+            except Exception:
+                self.close()
+                raise
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def set_model(self, model_name):
+        """Switch to another model; returns a Future resolved once loaded
+
+        Switching is instant when the model is resident in the registry.
+        Requests submitted afterwards use the new model.
+        """
+        item = _SwitchModel(model_name)
+        self._put(item)
+        return item.future
+
+    def submit(self, audio_path):
+        """Queue a file for transcription; returns a Future of (text, duration)"""
+        request = _Request(audio_path)
+        self._put(request)
+        return request.future
+
+    def transcribe(self, audio_path):
+        """Transcribe a file, blocking until done. Returns (text, duration)"""
+        return self.submit(audio_path).result()
+
+    def transcribe_batch(self, audio_paths):
+        """Transcribe several files together. Returns a list of (text, duration)"""
+        futures = [self.submit(path) for path in audio_paths]
+        return [future.result() for future in futures]
+
+    async def transcribe_async(self, audio_path):
+        """Await the transcription of a file. Returns (text, duration)"""
+        return await asyncio.wrap_future(self.submit(audio_path))
+
+    def memory_report(self):
+        """Peak RSS (MB) per stage: load, decode, transcribe"""
+        return self.monitor.report()
+
+    def close(self, wait=True):
+        """Stop the inference thread after pending requests finish"""
+        with self._put_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+        self.monitor.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Inference thread
+    # ------------------------------------------------------------------
+
+    def _put(self, item):
+        with self._put_lock:
+            if self._closed:
+                raise RuntimeError("Transcriber is closed")
+            self._queue.put(item)
+
+    def _fail_pending(self):
+        """Fail anything still queued once the inference thread stops"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item.future.set_running_or_notify_cancel():
+                item.future.set_exception(RuntimeError("Transcriber is closed"))
+
+    def _run(self):
+        """Inference loop: apply model switches, coalesce requests into batches"""
+        deferred = None
+
+        while True:
+            item = deferred if deferred is not None else self._queue.get()
+            deferred = None
+
+            if item is _STOP:
+                self._fail_pending()
+                break
+
+            if isinstance(item, _SwitchModel):
+                self._switch_model(item)
+                continue
+
+            # Collect requests that are already queued or arrive shortly
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        nxt = self._queue.get(timeout=remaining)
+                    else:
+                        nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if not isinstance(nxt, _Request):
+                    # Model switch or stop: handle after this batch
+                    deferred = nxt
+                    break
+                batch.append(nxt)
+
+            self._run_batch(batch)
+
+    def _switch_model(self, item):
+        if not item.future.set_running_or_notify_cancel():
+            return
+
+        # If both models can't fit, drop ours so eviction actually frees it
+        previous = self.model_name
+        if self.registry.needs_room(item.model_name):
+            self._model = None
+
+        try:
+            with self.monitor.stage("load"):
+                self._model = self.registry.get(item.model_name)
+            self.model_name = item.model_name
+            self._switch_error = None
+            item.future.set_result(item.model_name)
+        except Exception as e:
+            self._switch_error = e
+            self._restore_model(previous)
+            item.future.set_exception(e)
+
+    def _restore_model(self, name):
+        """Fall back to a previous model after a failed switch (reloading if evicted)"""
+        if self._model is not None or name is None:
+            return
+        try:
+            self._model = self.registry.get(name)
+        except Exception:
+            self.model_name = None
+
+    def _check_model(self):
+        """Raise if no model is loaded, with the last load error if any"""
+        if self._model is None:
+            if self._switch_error is not None:
+                raise RuntimeError(f"No model loaded: {self._switch_error}") \
+                    from self._switch_error
+            raise RuntimeError("No model loaded")
+
+    def _run_batch(self, batch):
+        """Transcribe a batch of requests with one model call"""
+        if self.low_memory:
+            self._run_batch_low_memory(batch)
+            return
+
+        # Convert audio; a bad file only fails its own request
+        prepared = []
+        for request in batch:
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self.monitor.stage("decode"):
+                    temp_wav, duration = convert_to_wav_16k(request.audio_path)
+                prepared.append((request, temp_wav, duration))
+            except Exception as e:
+                request.future.set_exception(e)
+
+        if not prepared:
+            return
+
+        try:
+            try:
+                import torch
+
+                self._check_model()
+            except Exception as e:
+                _fail(prepared, e)
+                return
+
+            # Bound the padded batch by total audio length; a failing model
+            # call only fails the requests in it
+            for group in _group_by_duration(prepared, self.max_batch_seconds):
+                try:
+                    paths = [temp_wav for _, temp_wav, _ in group]
+                    with torch.no_grad(), self.monitor.stage("transcribe"):
+                        results = self._model.transcribe(paths, batch_size=len(paths))
+
+                    for (request, _, duration), result in zip(group, results):
+                        request.future.set_result((_result_text(result), duration))
+                except Exception as e:
+                    _fail(group, e)
+
+        finally:
+            for _, temp_wav, _ in prepared:
+                if os.path.exists(temp_wav):
+                    os.remove(temp_wav)
+
+    def _run_batch_low_memory(self, batch):
+        """Transcribe requests in budget-sized chunks and batches"""
+        chunk_seconds, batch_seconds = self.budget.plan()
+
+        # Decode into chunks; a bad file only fails its own request
+        units = []  # (request, temp_wav, duration) per chunk
+        for request in batch:
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self.monitor.stage("decode"):
+                    chunks = convert_to_wav_chunks(request.audio_path, chunk_seconds)
+                units.extend((request, temp_wav, duration) for temp_wav, duration in chunks)
+            except Exception as e:
+                request.future.set_exception(e)
+
+        if not units:
+            return
+
+        texts = {}
+        try:
+            try:
+                import torch
+
+                self._check_model()
+            except Exception as e:
+                _fail(units, e)
+                return
+
+            # Fill each model call with chunks up to the planned audio length
+            pos = 0
+            while pos < len(units):
+                group = _group_by_duration(units[pos:], batch_seconds, self.max_batch_size)[0]
+                pos += len(group)
+
+                # Skip chunks of requests that already failed in another call
+                group = [unit for unit in group if not unit[0].future.done()]
+                if not group:
+                    continue
+
+                try:
+                    paths = [temp_wav for _, temp_wav, _ in group]
+                    baseline = current_rss_mb()
+                    with torch.no_grad(), inference_context(self._model), \
+                            self.monitor.stage("transcribe") as run:
+                        results = self._model.transcribe(paths, batch_size=len(paths))
+
+                    for (request, _, _), result in zip(group, results):
+                        texts.setdefault(request, []).append(_result_text(result))
+                    del results
+
+                    # Learn from this call
+                    audio_seconds = sum(duration for _, _, duration in group)
+                    self.budget.observe(baseline, run.peak_mb, audio_seconds)
+                except Exception as e:
+                    _fail(group, e)
+
+                # Free this call's buffers, re-plan the batch length
+                release_memory()
+                _, batch_seconds = self.budget.plan()
+
+            durations = {}
+            for request, _, duration in units:
+                durations[request] = durations.get(request, 0) + duration
+            for request, duration in durations.items():
+                if not request.future.done():
+                    text = " ".join(t for t in texts.get(request, []) if t)
+                    request.future.set_result((text, duration))
+
+        finally:
+            for _, temp_wav, _ in units:
+                if os.path.exists(temp_wav):
+                    os.remove(temp_wav)